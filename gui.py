@@ -3,21 +3,56 @@ from tkinter import ttk, messagebox
 import json
 import os
 import threading
-import math
+import io
+import base64
 import sys  # For global exception handling
 import signal  # For signal handling on forced termination
 import atexit  # Enhanced: Ensure atexit works with signals
-from PIL import Image, ImageDraw  # Required: pip install pillow
+from PIL import Image  # Required: pip install pillow
 import pystray  # Required: pip install pystray
-from screengamma import get_gamma_ramp, set_gamma_ramp, backup_and_restore, set_gamma_ramp_all_screens
+from screengamma import get_gamma_ramp, set_gamma_ramp, build_ramp, apply_ramp
+
+try:
+    import orjson  # Optional: pip install orjson (faster config load/save)
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4).encode()
 
 CONFIG_FILE = "config.json"
+GAMMA_DEBOUNCE_MS = 16  # Coalesce slider events within roughly one frame
+
+# Tray icon: 64x64 gear (gray circle + 8 radial black teeth on white), pre-rendered PNG
+_GEAR_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAIAAAAlC+aJAAABPElEQVR42u2awQ7EIAhEi/G/m365"
+    "PTTZi7tWBnElDsdNHHhgrbCVUsoR2dIR3AhAAAIQ4JeJiIiwAgQgAAFGAWiPlFLKhJtiUkU/4VjU"
+    "ukj96cQcANGrXIiqyh/p11XXddU/nuc5RBwHeNw0lnyNu4cEix4BMIbewGinxvcYBaKvV2GptFYA"
+    "C131bDhWYEj0Rp2NrxKj0m9USytEb9Hccgt5pB9WZj8QDsBv/2D64SuQO7uKZafweeXs9uQxt/uv"
+    "qFtoEevJ437HqOXu7qHPN3FEAL9dBCjvuoU8ioBppsn+hqvtfQqNKoJFBxls1TNAuEmwpyAB0df3"
+    "RCyOxojXqwKvM2R4On1MGK+rHAD/D2AM6gp4twpaBt0zMKHReVz0O1rxPaBKkzuA9ycf7AcIQIDg"
+    "JvxylwAEIMBf7QavL59t0d8bOgAAAABJRU5ErkJggg=="
+)
+
+
+class _NullStatus:
+    """Stand-in for the status label before the UI exists (config() does nothing)"""
+
+    def config(self, **kwargs):
+        pass
 
 
 class ScreenGammaGUI:
     def __init__(self):
         self.original_ramp = get_gamma_ramp()  # Backup original values
-        backup_and_restore(self.original_ramp)  # Register global restore (on normal exit)
+        # Set once the original ramp has been restored; every exit path below funnels
+        # into _restore_gamma, so only the first one talks to the driver
+        self._restored = threading.Event()
 
         # Enhanced: Global exception handler to ensure recovery on crash
         self._original_excepthook = sys.excepthook
@@ -26,7 +61,7 @@ class ScreenGammaGUI:
         # Enhanced: Signal handlers for forced termination (e.g., PyCharm stop button sends SIGINT)
         self._setup_signal_handlers()
 
-        # Enhanced: Additional atexit for extra safety
+        # Enhanced: atexit restore (on normal exit)
         atexit.register(self._atexit_restore)
 
         self.root = tk.Tk()
@@ -40,9 +75,29 @@ class ScreenGammaGUI:
         self.brightness_var = tk.DoubleVar(value=0.0)
         self.contrast_var = tk.DoubleVar(value=1.0)
 
-        # Configuration (only one)
+        # Serializes config writes (background save threads and the blocking save on quit)
+        self._save_lock = threading.RLock()
+
+        # Pending debounced gamma update (Tk after id)
+        self._pending = None
+
+        # Gamma worker: the UI thread drops the latest (g, b, c) into the slot and the
+        # worker applies it, so driver latency never blocks the event loop. Older values
+        # still in the slot are simply overwritten.
+        self._gamma_slot = None
+        self._gamma_slot_lock = threading.Lock()
+        self._gamma_evt = threading.Event()
+        self._gamma_lock = threading.Lock()  # Held around every driver call (worker and restore)
+        self.gamma_thread = threading.Thread(target=self._gamma_worker, daemon=True)
+        self.gamma_thread.start()
+
+        # Configuration (only one); self.config is the source of truth, the disk copy
+        # is only rewritten when it differs from the last snapshot known to be on disk
+        self._config_on_disk = None
         self.config = self.load_config()
 
+        # Status bar placeholder until setup_ui creates the real label
+        self.status = _NullStatus()
         self.setup_ui()
 
         # Apply configuration on startup (after UI initialization)
@@ -68,11 +123,15 @@ class ScreenGammaGUI:
         self._restore_gamma()
 
     def _restore_gamma(self):
-        """Centralized restore function"""
-        try:
-            set_gamma_ramp(self.original_ramp)
-        except Exception:
-            pass  # Ignore failed recovery
+        """Centralized restore function (runs at most once)"""
+        if self._restored.is_set():
+            return
+        self._restored.set()
+        with self._gamma_lock:  # Wait for an in-flight update; the worker stops applying after this
+            try:
+                set_gamma_ramp(self.original_ramp)
+            except Exception:
+                pass  # Ignore failed recovery
 
     def _crash_handler(self, exc_type, exc_value, exc_traceback):
         """Restore original values on crash"""
@@ -84,30 +143,82 @@ class ScreenGammaGUI:
         """Load a single configuration from JSON"""
         if os.path.exists(CONFIG_FILE):
             try:
-                with open(CONFIG_FILE, 'r') as f:
-                    return json.load(f)
+                with open(CONFIG_FILE, 'rb') as f:
+                    config = _json_loads(f.read())
+                self._config_on_disk = dict(config)
+                return config
             except Exception as e:
                 messagebox.showwarning("Warning", f"Failed to load configuration: {e}\nUsing default configuration.")
         return {'gamma': 1.0, 'brightness': 0.0, 'contrast': 1.0}
 
     def save_config(self):
-        """Save configuration to JSON"""
+        """Save configuration to JSON (blocking; used on quit)"""
+        with self._save_lock:  # Wait for any in-flight background save
+            if self.config == self._config_on_disk:
+                return  # Unchanged, skip the write
+            try:
+                self._write_json(dict(self.config))
+                self._config_on_disk = dict(self.config)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save configuration: {e}")
+
+    def _write_json(self, cfg):
+        """Write a configuration snapshot to disk atomically (via a temp file)"""
+        tmp_file = CONFIG_FILE + ".tmp"
+        with self._save_lock:
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(_json_dumps(cfg))
+                os.replace(tmp_file, CONFIG_FILE)
+            except Exception:
+                # Don't leave a stale temp file behind (e.g. config.json held open elsewhere)
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                raise
+
+    def _save_in_background(self):
+        """Worker thread: write the newest configuration, then report back on the main thread"""
+        error = None
+        with self._save_lock:
+            # Take the snapshot under the lock: writers may run out of order, so each one
+            # writes the latest values (or nothing, if an earlier writer already did)
+            cfg = dict(self.config)
+            if cfg != self._config_on_disk:
+                try:
+                    self._write_json(cfg)
+                    self._config_on_disk = cfg
+                except Exception as e:
+                    error = f"Failed to save configuration: {e}"
+        # Report only after releasing the lock: root.after from this thread can block until
+        # the main thread responds, and the main thread may be waiting on the lock in save_config
+        if error:
+            self._post(lambda: messagebox.showerror("Error", error))
+            return
+        self._post(lambda: self.status.config(text="Configuration saved", fg="blue"))
+
+    def _post(self, func):
+        """Run func on the main thread (from a worker); ignored once the main loop is gone"""
         try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(self.config, f, indent=4)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save configuration: {e}")
+            self.root.after(0, func)
+        except RuntimeError:
+            pass
 
-    def save_to_config(self):
-        """Save current values to configuration"""
+    def save_to_config(self, background=True):
+        """Save current values to configuration (disk write off the UI thread by default)"""
         self.config = {
             'gamma': self.gamma_var.get(),
             'brightness': self.brightness_var.get(),
             'contrast': self.contrast_var.get()
         }
-        self.save_config()
-        if hasattr(self, 'status'):
+        if not background:
+            self.save_config()
+            return
+        if self.config == self._config_on_disk:
             self.status.config(text="Configuration saved", fg="blue")
+            return  # Unchanged, skip the write
+        threading.Thread(target=self._save_in_background, daemon=True).start()
 
     def load_from_config(self):
         """Load configuration and apply (thread-safe)"""
@@ -117,8 +228,7 @@ class ScreenGammaGUI:
             self.brightness_var.set(self.config['brightness'])
             self.contrast_var.set(self.config['contrast'])
             self.update_gamma()
-            if hasattr(self, 'status'):
-                self.status.config(text="Configuration loaded", fg="blue")
+            self.status.config(text="Configuration loaded", fg="blue")
 
         self.root.after(0, _load)
 
@@ -138,19 +248,8 @@ class ScreenGammaGUI:
 
     def setup_tray(self):
         """Setup system tray (simple gear icon + left-click activation)"""
-        # Create a simple gear icon
-        image = Image.new('RGB', (64, 64), color='white')
-        draw = ImageDraw.Draw(image)
-        # Gear body: circle
-        draw.ellipse([16, 16, 48, 48], fill='gray')
-        # Add teeth: radial lines
-        for i in range(8):
-            angle = i * 45 * math.pi / 180
-            x1 = 32 + 20 * math.cos(angle)
-            y1 = 32 + 20 * math.sin(angle)
-            x2 = 32 + 25 * math.cos(angle)
-            y2 = 32 + 25 * math.sin(angle)
-            draw.line((x1, y1, x2, y2), fill='black', width=2)
+        # Pre-rendered gear icon (constant data, no drawing at startup)
+        image = Image.open(io.BytesIO(_GEAR_PNG))
 
         menu = pystray.Menu(
             pystray.MenuItem("📥 Load Configuration", self._tray_callback(self.load_from_config)),
@@ -180,7 +279,10 @@ class ScreenGammaGUI:
 
     def quit_app(self):
         """Quit the app completely (restore original values)"""
-        self.save_to_config()  # Save current configuration
+        self.save_to_config(background=False)  # Save current configuration (must finish before exit)
+        if self._pending:
+            self.root.after_cancel(self._pending)  # Drop any update that would re-apply after restore
+            self._pending = None
         self._restore_gamma()  # Force restore
         if hasattr(self, 'icon'):
             self.icon.stop()
@@ -261,26 +363,49 @@ class ScreenGammaGUI:
             self.brightness_var.set(0.0)
             self.contrast_var.set(1.0)
             self.update_gamma()
-            if hasattr(self, 'status'):
-                self.status.config(text="Reset to Default!", fg="orange")
+            self.status.config(text="Reset to Default!", fg="orange")
 
         self.root.after(0, _reset)
 
     def update_gamma(self, *args):
-        """Update gamma (with exception handling)"""
-        try:
-            gamma = self.gamma_var.get()
-            brightness = self.brightness_var.get()
-            contrast = self.contrast_var.get()
-            set_gamma_ramp_all_screens(gamma, brightness, contrast)  # Call without checking success
-            if hasattr(self, 'status'):
-                self.status.config(text=f"Live: G={gamma:.1f} B={brightness:.1f} C={contrast:.1f}", fg="green")
-        except Exception as e:
-            if hasattr(self, 'status'):
-                self.status.config(text=f"❌ Update failed: {str(e)}", fg="red")
-            else:
-                # Ignore on startup, UI not ready
-                pass
+        """Update gamma (status now; the driver call is debounced to the last value of a slider burst)"""
+        gamma = self.gamma_var.get()
+        brightness = self.brightness_var.get()
+        contrast = self.contrast_var.get()
+        self.status.config(text=f"Live: G={gamma:.1f} B={brightness:.1f} C={contrast:.1f}", fg="green")
+        if self._pending:
+            self.root.after_cancel(self._pending)
+        self._pending = self.root.after(GAMMA_DEBOUNCE_MS, self._apply_gamma)
+
+    def _apply_gamma(self):
+        """Hand the current slider values to the gamma worker (does not wait for the driver)"""
+        self._pending = None
+        params = (self.gamma_var.get(), self.brightness_var.get(), self.contrast_var.get())
+        with self._gamma_slot_lock:
+            self._gamma_slot = params
+        self._gamma_evt.set()
+
+    def _gamma_worker(self):
+        """Worker thread: apply the latest posted values (with exception handling)"""
+        while True:
+            self._gamma_evt.wait()
+            self._gamma_evt.clear()
+            with self._gamma_slot_lock:
+                params, self._gamma_slot = self._gamma_slot, None
+            if params is None:
+                continue
+            error = None
+            with self._gamma_lock:
+                if self._restored.is_set():
+                    return  # Shutting down, keep the original ramp
+                try:
+                    apply_ramp(build_ramp(*params))  # Call without checking success
+                except Exception as e:
+                    error = f"❌ Update failed: {str(e)}"
+            # Report only after releasing the lock: root.after from this thread can block until
+            # the main thread responds, and the main thread may be waiting on it in _restore_gamma
+            if error:
+                self._post(lambda error=error: self.status.config(text=error, fg="red"))
 
     def run(self):
         try:
@@ -1,11 +1,38 @@
 import ctypes
 from ctypes import wintypes
-import atexit  # Optional: used for global restore registration, but already handled in GUI
+import functools
+import atexit  # Used for releasing the cached DC and global restore registration
+import numpy as np  # Required: pip install numpy
 
 user32 = ctypes.windll.user32
 gdi32 = ctypes.windll.gdi32
 GAMMA_RAMP_SIZE = 256
 
+# Function prototypes (skip ctypes' default argument conversion on every call)
+user32.GetDC.argtypes = [wintypes.HWND]
+user32.GetDC.restype = wintypes.HDC
+user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+user32.ReleaseDC.restype = ctypes.c_int
+gdi32.GetDeviceGammaRamp.argtypes = [wintypes.HDC, ctypes.c_void_p]
+gdi32.GetDeviceGammaRamp.restype = wintypes.BOOL
+gdi32.SetDeviceGammaRamp.argtypes = [wintypes.HDC, ctypes.c_void_p]
+gdi32.SetDeviceGammaRamp.restype = wintypes.BOOL
+
+# Screen device context, acquired once and released at exit
+_HDC = user32.GetDC(None)
+atexit.register(lambda: user32.ReleaseDC(None, _HDC))
+
+# Normalized ramp indices (0.0-1.0), computed once at import
+_NORMALIZED = np.arange(GAMMA_RAMP_SIZE, dtype=np.float64) / 255.0
+_NORMALIZED.flags.writeable = False  # Shared across calls; in-place ops must work on a copy
+
+# Gamma curves (_NORMALIZED ** (1 / gamma)) keyed on the already-rounded gamma;
+# the slider resolution of 0.1 keeps this to a few dozen entries
+_POW_CACHE = {}
+
+# Raw bytes of the ramp applied by apply_ramp that is currently on screen; None if unknown
+_last_applied_bytes = None
+
 class GammaRamp(ctypes.Structure):
     _fields_ = [
         ("red", wintypes.USHORT * GAMMA_RAMP_SIZE),
@@ -15,34 +42,66 @@ class GammaRamp(ctypes.Structure):
 
 def get_gamma_ramp():
     """Get the current gamma ramp"""
-    hdc = user32.GetDC(0)
     ramp = GammaRamp()
-    gdi32.GetDeviceGammaRamp(hdc, ctypes.byref(ramp))
-    user32.ReleaseDC(0, hdc)
+    gdi32.GetDeviceGammaRamp(_HDC, ctypes.byref(ramp))
     return ramp
 
 def set_gamma_ramp(ramp):
     """Set the gamma ramp (for single or primary screen)"""
-    hdc = user32.GetDC(0)
-    success = gdi32.SetDeviceGammaRamp(hdc, ctypes.byref(ramp))
-    user32.ReleaseDC(0, hdc)
+    global _last_applied_bytes
+    _last_applied_bytes = None  # Unconditional set (e.g. restore): forget what apply_ramp put on screen
+    return gdi32.SetDeviceGammaRamp(_HDC, ctypes.byref(ramp))
+
+def _gamma_curve(gamma):
+    """Get the (cached, read-only) gamma-corrected curve for the given gamma"""
+    curve = _POW_CACHE.get(gamma)
+    if curve is None:
+        curve = _NORMALIZED ** (1.0 / max(gamma, 0.1))
+        curve.flags.writeable = False
+        _POW_CACHE[gamma] = curve
+    return curve
+
+@functools.lru_cache(maxsize=128)
+def _build_ramp(gamma, brightness, contrast):
+    """Build the gamma ramp for the given parameters (cached; do not mutate the result)"""
+    # Normalize brightness: -1 to 1 shifts the value, with a 30% range for realism.
+    # Clamp before contrast too: a single final clamp would let overshoot from a large
+    # brightness come back into range under low contrast and change the result.
+    val = np.add(_gamma_curve(gamma), brightness * 0.3)  # The only allocation; the rest is in place
+    np.clip(val, 0.0, 1.0, out=val)
+    # Contrast adjustment, (val - 0.5) * contrast + 0.5, then scale to 16 bit and clamp once
+    val -= 0.5
+    val *= contrast
+    val += 0.5
+    val *= 65535
+    np.clip(val, 0.0, 65535.0, out=val)
+
+    # Fresh struct: every channel is overwritten, so no need to read the current ramp.
+    # Write straight into its memory through a (red, green, blue) x 256 uint16 view.
+    ramp = GammaRamp()
+    channels = np.frombuffer(ramp, dtype=np.uint16).reshape(3, GAMMA_RAMP_SIZE)
+    channels[:] = val  # Broadcast to all three channels, truncating like int()
+    return ramp
+
+def build_ramp(gamma=1.0, brightness=0.0, contrast=1.0):
+    """Build the gamma ramp for the given parameters (pure; cached, do not mutate the result)"""
+    return _build_ramp(round(gamma, 2), round(brightness, 2), round(contrast, 2))
+
+def apply_ramp(ramp):
+    """Apply a ramp, skipping the GDI call if an identical ramp is already on screen"""
+    global _last_applied_bytes
+    # Compare contents, not parameters: different settings often quantize to the same ramp
+    raw = bytes(ramp)
+    if raw == _last_applied_bytes:
+        return True
+    success = set_gamma_ramp(ramp)
+    if success:
+        _last_applied_bytes = raw
     return success
 
 def set_gamma_ramp_all_screens(gamma=1.0, brightness=0.0, contrast=1.0):
     """Set the gamma ramp for all screens (simplified, works for the primary screen; multi-screen support requires EnumDisplayDevices)"""
-    original = get_gamma_ramp()
-    for i in range(GAMMA_RAMP_SIZE):
-        normalized = i / 255.0
-        gamma_corrected = normalized ** (1.0 / max(gamma, 0.1))
-        # Normalize brightness: -1 to 1 shifts the value, with a 30% range for realism
-        val = gamma_corrected + brightness * 0.3
-        val = max(0.0, min(1.0, val))
-        # Contrast adjustment
-        val = (val - 0.5) * contrast + 0.5
-        val = max(0.0, min(1.0, val))
-        val_16bit = int(val * 65535)
-        original.red[i] = original.green[i] = original.blue[i] = wintypes.USHORT(val_16bit)
-    return set_gamma_ramp(original)
+    return apply_ramp(build_ramp(gamma, brightness, contrast))
 
 def backup_and_restore(original_ramp):
     """Register the restore function (used with atexit)"""